@@ -5,35 +5,150 @@ Provides a configure_logging() function that sets up:
  - Optional JSON logging via environment flag LOG_JSON=true
  - Uvicorn / FastAPI logger alignment
  - Suppression of overly verbose third-party loggers
+ - Non-blocking emits via a QueueHandler drained by a background listener
+ - Batched stream writes via a MemoryHandler, flushed when full, on errors,
+   or after LOG_FLUSH_INTERVAL seconds (size via LOG_BUFFER_CAPACITY)
 """
 
 from __future__ import annotations
 
+import atexit
+import copy
 import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import sys
+import time
 from typing import Any, Dict
 
+try:
+    import orjson
+except ImportError:  # Optional fast serializer
+    orjson = None
+
 DEFAULT_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "1.0"))
+
+# Background listener feeding a buffer that owns the real stream handler
+_listener: logging.handlers.QueueListener | None = None
+_buffer: logging.handlers.MemoryHandler | None = None
+
+
+def shutdown_logging() -> None:
+    """Stop the queue listener and flush buffered records to the stream."""
+    global _listener, _buffer
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _buffer is not None:
+        _buffer.close()
+        _buffer = None
+
+
+if orjson is not None:
+
+    def _dumps(obj: Dict[str, Any]) -> str:
+        return orjson.dumps(obj).decode()
+
+else:
+
+    def _dumps(obj: Dict[str, Any]) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+
+def _buffer_capacity() -> int:
+    """Buffer size; local development defaults to unbuffered output."""
+    default = "1" if os.getenv("ENVIRONMENT", "local") == "local" else "512"
+    return int(os.getenv("LOG_BUFFER_CAPACITY", default))
+
+
+class _StderrHandler(logging.StreamHandler):
+    """StreamHandler that resolves sys.stderr at emit time.
+
+    Writes happen later on the listener thread (and a final flush at exit),
+    by which point sys.stderr may have been swapped or the stream captured
+    at configuration time closed, e.g. by pytest's output capture.
+    """
+
+    def __init__(self) -> None:
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):  # type: ignore[override]
+        return sys.stderr
+
+
+class _TimedMemoryHandler(logging.handlers.MemoryHandler):
+    """MemoryHandler that also flushes once its oldest record is stale."""
+
+    def __init__(self, capacity: int, interval: float, **kwargs: Any) -> None:
+        super().__init__(capacity, **kwargs)
+        self.interval = interval
+
+    def shouldFlush(self, record: logging.LogRecord) -> bool:
+        return super().shouldFlush(record) or (
+            record.created - self.buffer[0].created >= self.interval
+        )
+
+
+class _FlushingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that flushes its handlers whenever the queue goes idle."""
+
+    def __init__(self, *args: Any, interval: float, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.interval = interval
+
+    def dequeue(self, block: bool) -> Any:
+        while True:
+            try:
+                return self.queue.get(block, timeout=self.interval)
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    handler.flush()
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps exc_info for the listener's formatter.
+
+    The stock prepare() formats the whole record on the calling thread and
+    drops exc_info. Here only the message is merged with its args, so later
+    mutation of those args cannot change what gets logged; the traceback
+    and final formatting are left to the listener's handler.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        msg = record.getMessage()
+        record = copy.copy(record)
+        record.message = msg
+        record.msg = msg
+        record.args = None
+        return record
 
 
 class JsonFormatter(logging.Formatter):
     """Simple JSON log formatter."""
 
     def format(self, record: logging.LogRecord) -> str:  # noqa: D401
+        ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
         base: Dict[str, Any] = {
-            "ts": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
+            "ts": f"{ts}.{int(record.msecs):03d}Z",
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
         if record.exc_info:
-            base["exc_info"] = self.formatException(record.exc_info)
+            # Reuse the cached traceback text like logging.Formatter does
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            base["exc_info"] = record.exc_text
         for attr in ("workflow_id", "request_id"):
             if hasattr(record, attr):
                 base[attr] = getattr(record, attr)
-        return json.dumps(base, ensure_ascii=False)
+        return _dumps(base)
 
 
 def configure_logging(
@@ -55,6 +170,7 @@ def configure_logging(
 
     for h in list(root.handlers):
         root.removeHandler(h)
+    shutdown_logging()
 
     use_json = (
         json_logs
@@ -63,15 +179,34 @@ def configure_logging(
     )
 
     if use_json:
-        handler: logging.Handler = logging.StreamHandler()
+        handler: logging.Handler = _StderrHandler()
         handler.setFormatter(JsonFormatter())
     else:
         pattern = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
-        handler = logging.StreamHandler()
+        handler = _StderrHandler()
         handler.setFormatter(logging.Formatter(pattern))
 
+    # Batch stream writes until the buffer fills, an error arrives or the
+    # oldest record has waited FLUSH_INTERVAL seconds
+    global _listener, _buffer
+    _buffer = _TimedMemoryHandler(
+        _buffer_capacity(),
+        FLUSH_INTERVAL,
+        flushLevel=logging.ERROR,
+        target=handler,
+        flushOnClose=True,
+    )
+
+    # Request paths only enqueue records; formatting and stream I/O
+    # happen on the listener thread
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = _FlushingQueueListener(
+        log_queue, _buffer, respect_handler_level=True, interval=FLUSH_INTERVAL
+    )
+    _listener.start()
+
     root.setLevel(DEFAULT_LEVEL)
-    root.addHandler(handler)
+    root.addHandler(_InProcessQueueHandler(log_queue))
 
     # Align uvicorn loggers
     for name in ["uvicorn", "uvicorn.error", "uvicorn.access"]:
@@ -87,4 +222,6 @@ def configure_logging(
     )
 
 
-__all__ = ["configure_logging"]
+atexit.register(shutdown_logging)
+
+__all__ = ["configure_logging", "shutdown_logging"]
@@ -3,32 +3,64 @@
 Refactored to use centralized settings and expose diagnostic endpoints.
 """
 
-from typing import Any, Dict, List
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
 
 import uvicorn
-from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from backend.trip_planner_agent import TripRequest, plan_trip
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, ConfigDict
+from backend.trip_planner_agent import (
+    TripRequest,
+    get_llm,
+    get_trip_planner_graph,
+    plan_trip,
+)
 
 from backend.logging_config import configure_logging
-from backend.settings import settings
+from backend.settings import load_env_once, settings
 from backend.version import __version__
 
-load_dotenv()
+try:
+    import orjson
+except ImportError:  # Optional fast serializer
+    orjson = None
+
+# ORJSONResponse asserts orjson is importable; fall back to stdlib JSON
+PlanJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+load_env_once()
 configure_logging()
 
-if settings.langfuse_public_key and settings.langfuse_secret_key:
-    print("✅ Langfuse environment variables loaded successfully")
-else:
-    print("⚠️ Langfuse env vars not found; check .env")
+logger = logging.getLogger(__name__)
+logger.debug(
+    "Langfuse credentials configured: %s",
+    bool(settings.langfuse_public_key and settings.langfuse_secret_key),
+)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Warm the LLM client and compiled graph before accepting traffic."""
+    if settings.openai_api_key:
+        get_llm()
+    get_trip_planner_graph()
+    yield
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.app_name,
     description="A LangGraph-based trip planning system",
     version=__version__,
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -44,6 +76,8 @@ app.add_middleware(
 class TripPlanRequest(BaseModel):
     """Request model for trip planning."""
 
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     destination: str
     duration: int
     budget: float
@@ -54,12 +88,46 @@ class TripPlanRequest(BaseModel):
     transportation_type: str = "flight"
 
 
+class FinalPlan(BaseModel):
+    """Synthesized plan produced by the coordinator agent."""
+
+    model_config = ConfigDict(frozen=True)
+
+    summary: str
+    destination: str
+    duration: int
+    budget: float
+    interests: List[str]
+    itinerary: List[Dict[str, Any]]
+    accommodation: Dict[str, Any]
+    transportation: Dict[str, Any]
+    budget_breakdown: Dict[str, Any]
+    recommendations: Dict[str, Any]
+    tips: str
+
+
+class TripPlanData(BaseModel):
+    """Payload returned by plan_trip."""
+
+    model_config = ConfigDict(frozen=True)
+
+    final_plan: FinalPlan
+    messages: List[str]
+    destination: str
+    duration: int
+    budget: float
+    interests: List[str]
+    workflow_id: str
+
+
 class TripPlanResponse(BaseModel):
     """Response model for trip planning."""
 
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     success: bool
-    data: Dict[str, Any] = None
-    error: str = None
+    data: Optional[TripPlanData] = None
+    error: Optional[str] = None
 
 
 @app.get("/")
@@ -68,27 +136,41 @@ async def root():
     return {"message": "Trip Planner Agent API is running!"}
 
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint."""
-    return {
+def _static_json(payload: Dict[str, Any]) -> tuple[bytes, str]:
+    """Serialize a static payload once and derive its ETag."""
+    body = json.dumps(payload).encode()
+    return body, f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+
+
+def _conditional_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+) -> Response:
+    """Return 304 when the client already holds the current representation."""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
+
+
+# Diagnostic payloads only depend on import-time settings
+_HEALTH_BYTES, _HEALTH_ETAG = _static_json(
+    {
         "status": "healthy",
         "service": "trip-planner-agent",
         "version": __version__,
         "environment": settings.environment,
     }
+)
 
+_VERSION_BYTES, _VERSION_ETAG = _static_json({"version": __version__})
 
-@app.get("/version")
-async def version():
-    """Return service version only."""
-    return {"version": __version__}
-
-
-@app.get("/config")
-async def config_snapshot():
-    """Return non-sensitive configuration snapshot (secrets redacted)."""
-    return {
+_CONFIG_BYTES, _CONFIG_ETAG = _static_json(
+    {
         "app_name": settings.app_name,
         "environment": settings.environment,
         "version": __version__,
@@ -97,9 +179,32 @@ async def config_snapshot():
         "langfuse_secret_key": bool(settings.langfuse_secret_key),
         "langfuse_host": settings.langfuse_host,
     }
+)
+
+
+@app.get("/health")
+async def health_check(request: Request):
+    """Health check endpoint."""
+    return _conditional_response(request, _HEALTH_BYTES, _HEALTH_ETAG)
 
 
-@app.post("/plan-trip", response_model=TripPlanResponse)
+@app.get("/version")
+async def version(request: Request):
+    """Return service version only."""
+    return _conditional_response(request, _VERSION_BYTES, _VERSION_ETAG)
+
+
+@app.get("/config")
+async def config_snapshot(request: Request):
+    """Return non-sensitive configuration snapshot (secrets redacted)."""
+    return _conditional_response(request, _CONFIG_BYTES, _CONFIG_ETAG)
+
+
+@app.post(
+    "/plan-trip",
+    response_model=TripPlanResponse,
+    response_class=PlanJSONResponse,
+)
 async def create_trip_plan(request: TripPlanRequest):
     """Create a comprehensive trip plan"""
     try:
@@ -119,60 +224,89 @@ async def create_trip_plan(request: TripPlanRequest):
             transportation_type=request.transportation_type,
         )
 
-        # Generate trip plan
-        result = plan_trip(trip_request)
+        # Generate trip plan off the event loop; the graph invokes the LLM
+        # synchronously
+        result = await asyncio.to_thread(plan_trip, trip_request)
 
-        return TripPlanResponse(success=True, data=result)
+        response = TripPlanResponse(success=True, data=result)
 
     except ValueError as e:
-        return TripPlanResponse(success=False, error=str(e))
+        response = TripPlanResponse(success=False, error=str(e))
+
+    # Already validated above; serialize directly instead of re-encoding
+    return PlanJSONResponse(response.model_dump(mode="json"))
+
+
+# Static catalog payloads, serialized once at import time
+_DESTINATIONS_PAYLOAD = json.dumps(
+    {
+        "destinations": [
+            {"name": "Paris", "country": "France", "currency": "EUR"},
+            {"name": "Tokyo", "country": "Japan", "currency": "JPY"},
+            {"name": "New York", "country": "USA", "currency": "USD"},
+            {"name": "London", "country": "UK", "currency": "GBP"},
+            {"name": "Rome", "country": "Italy", "currency": "EUR"},
+            {"name": "Barcelona", "country": "Spain", "currency": "EUR"},
+            {"name": "Amsterdam", "country": "Netherlands", "currency": "EUR"},
+            {"name": "Sydney", "country": "Australia", "currency": "AUD"},
+            {"name": "Dubai", "country": "UAE", "currency": "AED"},
+            {"name": "Bangkok", "country": "Thailand", "currency": "THB"},
+        ]
+    }
+).encode()
+
+_INTERESTS_PAYLOAD = json.dumps(
+    {
+        "interests": [
+            "art",
+            "history",
+            "food",
+            "nature",
+            "adventure",
+            "culture",
+            "shopping",
+            "nightlife",
+            "beaches",
+            "mountains",
+            "museums",
+            "architecture",
+            "photography",
+            "music",
+            "sports",
+            "wellness",
+            "local experiences",
+            "festivals",
+            "wildlife",
+            "hiking",
+        ]
+    }
+).encode()
 
 
 @app.get("/destinations")
 async def get_popular_destinations():
     """Get list of popular destinations"""
-    destinations = [
-        {"name": "Paris", "country": "France", "currency": "EUR"},
-        {"name": "Tokyo", "country": "Japan", "currency": "JPY"},
-        {"name": "New York", "country": "USA", "currency": "USD"},
-        {"name": "London", "country": "UK", "currency": "GBP"},
-        {"name": "Rome", "country": "Italy", "currency": "EUR"},
-        {"name": "Barcelona", "country": "Spain", "currency": "EUR"},
-        {"name": "Amsterdam", "country": "Netherlands", "currency": "EUR"},
-        {"name": "Sydney", "country": "Australia", "currency": "AUD"},
-        {"name": "Dubai", "country": "UAE", "currency": "AED"},
-        {"name": "Bangkok", "country": "Thailand", "currency": "THB"},
-    ]
-    return {"destinations": destinations}
+    return Response(
+        content=_DESTINATIONS_PAYLOAD,
+        media_type="application/json",
+    )
 
 
 @app.get("/interests")
 async def get_common_interests():
     """Get list of common travel interests"""
-    interests = [
-        "art",
-        "history",
-        "food",
-        "nature",
-        "adventure",
-        "culture",
-        "shopping",
-        "nightlife",
-        "beaches",
-        "mountains",
-        "museums",
-        "architecture",
-        "photography",
-        "music",
-        "sports",
-        "wellness",
-        "local experiences",
-        "festivals",
-        "wildlife",
-        "hiking",
-    ]
-    return {"interests": interests}
+    return Response(content=_INTERESTS_PAYLOAD, media_type="application/json")
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # uvloop has no Windows build; fall back to the stdlib loop there
+    local = settings.environment == "local"
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        reload=local,
+        workers=1 if local else int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
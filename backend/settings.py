@@ -1,13 +1,14 @@
 """Centralized application settings using Pydantic BaseSettings.
 
-Loads environment variables from a .env file (already handled early in main)
-but provides a single import location to access configuration across the
+Loads environment variables from a .env file exactly once per process and
+provides a single import location to access configuration across the
 backend.
 """
 
 from functools import lru_cache
 from typing import Optional
 
+from dotenv import load_dotenv
 from pydantic import Field
 
 try:
@@ -16,6 +17,12 @@ except ImportError:  # Fallback if installed differently
     from pydantic import BaseSettings  # type: ignore
 
 
+@lru_cache(maxsize=1)
+def load_env_once() -> None:
+    """Load .env into the process environment; later calls are no-ops."""
+    load_dotenv()
+
+
 class Settings(BaseSettings):
     """Application configuration settings loaded from environment variables."""
 
@@ -50,7 +57,8 @@ class Settings(BaseSettings):
     )
 
     class Config:
-        env_file = ".env"
+        # .env is already applied to os.environ by load_env_once()
+        env_file = None
         case_sensitive = False
         populate_by_name = True
         extra = "ignore"
@@ -58,6 +66,7 @@ class Settings(BaseSettings):
 
 @lru_cache()
 def get_settings() -> Settings:  # pragma: no cover - trivial wrapper
+    load_env_once()
     return Settings()  # type: ignore[arg-type]
 
 
@@ -0,0 +1,13 @@
+"""Shared pytest fixtures for backend tests."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Single TestClient for the run so app startup (lifespan) happens once."""
+    with TestClient(app) as c:
+        yield c
@@ -1,22 +1,23 @@
 """Basic FastAPI health endpoint tests."""
 
-from fastapi.testclient import TestClient
 
-from backend.main import app
-
-client = TestClient(app)
-
-
-def test_root():
+def test_root(client):
     resp = client.get("/")
     assert resp.status_code == 200
     body = resp.json()
     assert "Trip Planner" in body.get("message", "")
 
 
-def test_health():
+def test_health(client):
     resp = client.get("/health")
     assert resp.status_code == 200
     body = resp.json()
     assert body["status"] == "healthy"
     assert body["service"] == "trip-planner-agent"
+
+
+def test_health_not_modified(client):
+    etag = client.get("/health").headers["etag"]
+    resp = client.get("/health", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
@@ -0,0 +1,36 @@
+"""Logging pipeline tests (queue handler -> buffer -> stream)."""
+
+import json
+import logging
+
+from backend.logging_config import configure_logging, shutdown_logging
+
+
+def test_json_logs_keep_exc_info_and_snapshot_args(capsys):
+    configure_logging(force=True, json_logs=True)
+    try:
+        log = logging.getLogger("tests.logging")
+        state = {"step": 1}
+        log.info("state is %s", state)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("failed at %s", state)
+        state["step"] = 99
+        shutdown_logging()
+
+        records = [
+            json.loads(line)
+            for line in capsys.readouterr().err.splitlines()
+            if line.startswith("{")
+        ]
+        ours = [r for r in records if r["logger"] == "tests.logging"]
+        assert [r["message"] for r in ours] == [
+            "state is {'step': 1}",
+            "failed at {'step': 1}",
+        ]
+        assert "exc_info" not in ours[0]
+        assert "ValueError: boom" in ours[1]["exc_info"]
+        assert "Traceback" not in ours[1]["message"]
+    finally:
+        configure_logging(force=True)
@@ -1,30 +1,30 @@
 """Smoke test for /plan-trip endpoint with LLM mocked.
 
 Ensures the endpoint returns a success response structure without
-making real OpenAI calls.
+making real OpenAI calls, and that the coordinator joins the output of
+all four specialist agents.
 """
 
-from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
 
 import backend.trip_planner_agent as agent
-from backend.main import app
+from backend.settings import settings
 
 
 class DummyLLM:
-    def invoke(self, _messages):  # noqa: D401
-        class R:
-            def __init__(self):
-                self.content = "dummy response"
+    def __init__(self):
+        self.calls = []
 
-        return R()
+    def invoke(self, messages):  # noqa: D401
+        self.calls.append(messages)
+        # Echo the agent role so replies can be traced back to their node
+        return AIMessage(content=messages[0].content.split(".")[0])
 
 
-def test_plan_trip_smoke(monkeypatch):
-    def _dummy_get_llm():  # noqa: D401
-        return DummyLLM()
-
-    monkeypatch.setattr(agent, "get_llm", _dummy_get_llm)
-    client = TestClient(app)
+def test_plan_trip_smoke(client, monkeypatch):
+    llm = DummyLLM()
+    monkeypatch.setattr(agent, "get_llm", lambda: llm)
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
 
     payload = {
         "destination": "Paris",
@@ -43,3 +43,24 @@ def test_plan_trip_smoke(monkeypatch):
     assert data["success"] is True
     assert "data" in data
     assert data["data"]["destination"].lower() == "paris"
+
+    # Four specialists fan out with the trip details, then the coordinator
+    # runs once
+    assert len(llm.calls) == 5
+    for call in llm.calls[:4]:
+        context = " ".join(m.content for m in call[1:])
+        assert "Paris" in context
+        assert "1500" in context
+    coordinator_call = llm.calls[-1]
+    assert "trip planning coordinator" in coordinator_call[0].content
+    received = sorted(
+        m.content for m in coordinator_call[1:] if isinstance(m, AIMessage)
+    )
+    assert received == [
+        "You are a budget planning specialist",
+        "You are a travel research specialist",
+        "You are an accommodation specialist",
+        "You are an itinerary planning specialist",
+    ]
+    summary = data["data"]["final_plan"]["summary"]
+    assert summary == "You are the trip planning coordinator"
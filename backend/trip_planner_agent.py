@@ -3,22 +3,38 @@ LangGraph-based Trip Planner Agent
 
 This module implements a multi-agent trip planning system using LangGraph,
 where different agents handle different aspects of trip planning.
+
+It imports the shared backend settings, so run the example at the bottom
+from the repository root as a module:
+
+    python -m backend.trip_planner_agent
 """
 
+import logging
 import os
+import threading
+from functools import lru_cache
 import time
 import uuid
-from typing import Dict, List, Any, TypedDict, Annotated
+from typing import Dict, List, Any, Annotated
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import json
 
+try:
+    import orjson
+except ImportError:  # Optional fast serializer
+    orjson = None
+
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 from langchain_core.tools import tool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from backend.settings import settings
 
 # Import Langfuse integration
 try:
@@ -36,62 +52,84 @@ except ImportError:
             return func
         return decorator
 
+logger = logging.getLogger("trip_planner_agent")
+
+# Resolved once at import so per-call paths branch on a single flag
+_LANGFUSE_ENABLED = LANGFUSE_AVAILABLE and bool(settings.langfuse_public_key)
+
+if orjson is not None:
+    def _dumps(obj: Any) -> str:
+        """Serialize tool output as indented JSON."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+else:
+    def _dumps(obj: Any) -> str:
+        """Serialize tool output as indented JSON."""
+        return json.dumps(obj, indent=2)
+
 # Initialize the LLM lazily to avoid hanging on import
 llm = None
 langfuse_client = None
+_llm_lock = threading.Lock()
 
 def get_langfuse_client():
     """Get or create the Langfuse client for workflow tracing."""
     global langfuse_client
-    if langfuse_client is None and LANGFUSE_AVAILABLE and Langfuse:
+    if langfuse_client is None and _LANGFUSE_ENABLED:
         try:
             langfuse_client = Langfuse()
-            print("✅ Langfuse client initialized for workflow tracing")
+            logger.info("Langfuse client initialized for workflow tracing")
         except Exception as e:
-            print(f"⚠️  Failed to initialize Langfuse client: {e}")
+            logger.warning("Failed to initialize Langfuse client: %s", e)
             langfuse_client = None
     return langfuse_client
 
 def get_llm():
     """Get or create the LLM instance with OpenInference instrumentation and Langfuse tracing."""
     global llm
-    if llm is None:
-        # Initialize Langfuse callback handler if available
-        callbacks = []
-        if LANGFUSE_AVAILABLE and LangfuseCallbackHandler:
-            try:
-                # Langfuse callback handler gets credentials from environment variables automatically
-                langfuse_handler = LangfuseCallbackHandler()
-                callbacks.append(langfuse_handler)
-                print("✅ Langfuse callback handler initialized")
-            except Exception as e:
-                print(f"⚠️  Failed to initialize Langfuse callback handler: {e}")
-        
-        # Initialize the LLM (OpenInference will automatically instrument it)
-        llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            temperature=0.7,
-            api_key=os.getenv("OPENAI_API_KEY"),
-            callbacks=callbacks  # Add Langfuse callback for tracing
-        )
+    if llm is not None:
+        return llm
+    # Parallel agent nodes may race here before the first instance exists
+    with _llm_lock:
+        if llm is None:
+            # Initialize Langfuse callback handler if available
+            callbacks = []
+            if _LANGFUSE_ENABLED:
+                try:
+                    # Langfuse callback handler gets credentials from environment variables automatically
+                    langfuse_handler = LangfuseCallbackHandler()
+                    callbacks.append(langfuse_handler)
+                    logger.info("Langfuse callback handler initialized")
+                except Exception as e:
+                    logger.warning("Failed to initialize Langfuse callback handler: %s", e)
+            
+            # Initialize the LLM (OpenInference will automatically instrument it)
+            llm = ChatOpenAI(
+                model="gpt-3.5-turbo",
+                temperature=0.7,
+                api_key=os.getenv("OPENAI_API_KEY"),
+                callbacks=callbacks  # Add Langfuse callback for tracing
+            )
     return llm
 
-class TripPlanningState(TypedDict):
+@dataclass(slots=True)
+class TripPlanningState:
     """State for the trip planning workflow"""
-    messages: Annotated[list, add_messages]
-    destination: str
-    duration: int
-    budget: float
-    interests: List[str]
-    travel_dates: Dict[str, str]
-    accommodation_preferences: Dict[str, Any]
-    transportation_preferences: Dict[str, Any]
-    itinerary: List[Dict[str, Any]]
-    recommendations: Dict[str, Any]
-    final_plan: Dict[str, Any]
+    messages: Annotated[list, add_messages] = field(default_factory=list)
+    destination: str = "Unknown"
+    duration: int = 0
+    budget: float = 0
+    interests: List[str] = field(default_factory=list)
+    travel_dates: Dict[str, str] = field(default_factory=dict)
+    accommodation_preferences: Dict[str, Any] = field(default_factory=dict)
+    transportation_preferences: Dict[str, Any] = field(default_factory=dict)
+    itinerary: List[Dict[str, Any]] = field(default_factory=list)
+    recommendations: Dict[str, Any] = field(default_factory=dict)
+    final_plan: Dict[str, Any] = field(default_factory=dict)
 
 class TripRequest(BaseModel):
     """Input model for trip planning requests"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
     destination: str = Field(..., description="The destination for the trip")
     duration: int = Field(..., description="Duration of the trip in days")
     budget: float = Field(..., description="Total budget for the trip")
@@ -101,44 +139,41 @@ class TripRequest(BaseModel):
     accommodation_type: str = Field(default="hotel", description="Type of accommodation preferred")
     transportation_type: str = Field(default="flight", description="Preferred transportation method")
 
-# Define tools for the agents
-@tool
-def research_destination(destination: str) -> str:
-    """Research information about a destination including weather, culture, and attractions."""
-    # In a real implementation, this would call external APIs
-    research_data = {
-        "paris": {
-            "weather": "Mild climate, best visited in spring or fall",
-            "culture": "Rich history, art, and cuisine",
-            "attractions": ["Eiffel Tower", "Louvre Museum", "Notre-Dame", "Champs-Élysées"],
-            "currency": "Euro",
-            "language": "French"
-        },
-        "tokyo": {
-            "weather": "Four distinct seasons, cherry blossoms in spring",
-            "culture": "Traditional and modern blend, excellent food scene",
-            "attractions": ["Tokyo Skytree", "Senso-ji Temple", "Shibuya Crossing", "Tsukiji Market"],
-            "currency": "Japanese Yen",
-            "language": "Japanese"
-        },
-        "new york": {
-            "weather": "Four seasons, can be cold in winter",
-            "culture": "Diverse, fast-paced, cultural hub",
-            "attractions": ["Statue of Liberty", "Central Park", "Times Square", "Broadway"],
-            "currency": "US Dollar",
-            "language": "English"
-        }
+# Canned destination data used by research_destination.
+# In a real implementation, this would come from external APIs
+_RESEARCH_DATA = {
+    "paris": {
+        "weather": "Mild climate, best visited in spring or fall",
+        "culture": "Rich history, art, and cuisine",
+        "attractions": ["Eiffel Tower", "Louvre Museum", "Notre-Dame", "Champs-Élysées"],
+        "currency": "Euro",
+        "language": "French"
+    },
+    "tokyo": {
+        "weather": "Four distinct seasons, cherry blossoms in spring",
+        "culture": "Traditional and modern blend, excellent food scene",
+        "attractions": ["Tokyo Skytree", "Senso-ji Temple", "Shibuya Crossing", "Tsukiji Market"],
+        "currency": "Japanese Yen",
+        "language": "Japanese"
+    },
+    "new york": {
+        "weather": "Four seasons, can be cold in winter",
+        "culture": "Diverse, fast-paced, cultural hub",
+        "attractions": ["Statue of Liberty", "Central Park", "Times Square", "Broadway"],
+        "currency": "US Dollar",
+        "language": "English"
     }
-    
-    dest_lower = destination.lower()
-    if dest_lower in research_data:
-        return json.dumps(research_data[dest_lower], indent=2)
-    else:
-        return f"Research data for {destination} not available. Please provide more details about your destination."
+}
 
-@tool
-def calculate_budget_breakdown(budget: float, duration: int, destination: str) -> str:
-    """Calculate a budget breakdown for the trip."""
+# Tool outputs are pure functions of their inputs, so the serialized
+# results are memoized on hashable primitive keys
+@lru_cache(maxsize=512)
+def _research_json(dest_lower: str) -> str | None:
+    data = _RESEARCH_DATA.get(dest_lower)
+    return _dumps(data) if data is not None else None
+
+@lru_cache(maxsize=512)
+def _budget_json(budget: float, duration: int) -> str:
     # Basic budget allocation
     accommodation_percent = 0.4
     food_percent = 0.3
@@ -154,29 +189,10 @@ def calculate_budget_breakdown(budget: float, duration: int, destination: str) -
         "total_budget": budget
     }
     
-    return json.dumps(breakdown, indent=2)
-
-@tool
-def generate_itinerary(destination: str, duration: int, interests: List[str], budget: float) -> str:
-    """Generate a detailed day-by-day itinerary."""
-    # Sample itinerary generation
-    itinerary = []
-    
-    for day in range(1, duration + 1):
-        day_plan = {
-            "day": day,
-            "morning": f"Explore {destination} - Visit local attractions",
-            "afternoon": f"Enjoy {interests[0] if interests else 'local culture'}",
-            "evening": "Dinner at local restaurant",
-            "estimated_cost": budget / duration * 0.3
-        }
-        itinerary.append(day_plan)
-    
-    return json.dumps(itinerary, indent=2)
+    return _dumps(breakdown)
 
-@tool
-def find_accommodations(destination: str, budget: float, accommodation_type: str) -> str:
-    """Find suitable accommodations within budget."""
+@lru_cache(maxsize=512)
+def _accommodation_json(budget: float) -> str:
     # Sample accommodation data
     accommodations = {
         "budget": [
@@ -201,147 +217,190 @@ def find_accommodations(destination: str, budget: float, accommodation_type: str
     else:
         category = "luxury"
     
-    return json.dumps(accommodations[category], indent=2)
+    return _dumps(accommodations[category])
+
+# Define tools for the agents
+@tool
+def research_destination(destination: str) -> str:
+    """Research information about a destination including weather, culture, and attractions."""
+    research = _research_json(destination.lower())
+    if research is not None:
+        return research
+    else:
+        return f"Research data for {destination} not available. Please provide more details about your destination."
+
+@tool
+def calculate_budget_breakdown(budget: float, duration: int, destination: str) -> str:
+    """Calculate a budget breakdown for the trip."""
+    return _budget_json(budget, duration)
+
+@tool
+def generate_itinerary(destination: str, duration: int, interests: List[str], budget: float) -> str:
+    """Generate a detailed day-by-day itinerary."""
+    # Sample itinerary generation - every day shares the same plan text and cost
+    morning = f"Explore {destination} - Visit local attractions"
+    afternoon = f"Enjoy {interests[0] if interests else 'local culture'}"
+    # Guard the hoisted division; a non-positive duration yields no days anyway
+    daily_cost = budget / duration * 0.3 if duration > 0 else 0.0
+    itinerary = [
+        {
+            "day": day,
+            "morning": morning,
+            "afternoon": afternoon,
+            "evening": "Dinner at local restaurant",
+            "estimated_cost": daily_cost
+        }
+        for day in range(1, duration + 1)
+    ]
+    
+    return _dumps(itinerary)
+
+@tool
+def find_accommodations(destination: str, budget: float, accommodation_type: str) -> str:
+    """Find suitable accommodations within budget."""
+    return _accommodation_json(budget)
 
 # Create the tools list
 tools = [research_destination, calculate_budget_breakdown, generate_itinerary, find_accommodations]
 tool_node = ToolNode(tools)
 
-# Define agent functions
-@observe(name="research_agent")
-def research_agent(state: TripPlanningState) -> TripPlanningState:
-    """Agent responsible for researching the destination."""
-    messages = state["messages"]
-    destination = state.get("destination", "Unknown")
-    
-    system_prompt = f"""You are a travel research specialist. Your job is to gather comprehensive information about {destination}.
+# System prompts - static ones are shared message instances, the rest are
+# templates filled from the workflow state
+_RESEARCH_TMPL = """You are a travel research specialist. Your job is to gather comprehensive information about {destination}.
     Use the research_destination tool to get information about {destination}.
     Provide detailed insights about weather, culture, attractions, and practical information for {destination}.
     Focus specifically on {destination} and provide accurate, destination-specific information."""
+
+_BUDGET_SYS = SystemMessage(content="""You are a budget planning specialist. Your job is to create a detailed budget breakdown for the trip.
+    Use the calculate_budget_breakdown tool to allocate the budget across different categories.
+    Provide recommendations for cost-saving opportunities.""")
+
+_ITINERARY_SYS = SystemMessage(content="""You are an itinerary planning specialist. Your job is to create a detailed day-by-day itinerary.
+    Use the generate_itinerary tool to create a comprehensive schedule.
+    Consider the user's interests, budget, and duration to create an optimal plan.""")
+
+_ACCOMMODATION_SYS = SystemMessage(content="""You are an accommodation specialist. Your job is to find suitable places to stay.
+    Use the find_accommodations tool to get accommodation options within the budget.
+    Consider location, amenities, and value for money.""")
+
+_COORDINATOR_TMPL = """You are the trip planning coordinator. Your job is to synthesize all the research and recommendations
+    into a comprehensive, actionable trip plan for {destination}.
+    
+    Trip Details:
+    - Destination: {destination}
+    - Duration: {duration} days
+    - Budget: ${budget}
+    - Interests: {interests}
+    
+    Create a final summary that includes:
+    1. Destination overview for {destination}
+    2. Budget breakdown for ${budget}
+    3. Detailed {duration}-day itinerary for {destination}
+    4. Accommodation recommendations in {destination}
+    5. Practical tips and reminders for {destination}
+    
+    Make sure the plan is realistic, within budget, and matches the user's interests. Focus specifically on {destination}."""
+
+# Opening user message describing the request, shared by all agents
+_REQUEST_TMPL = """Plan a trip to {destination} from {start_date} to {end_date} ({duration} days).
+    Total budget: ${budget}
+    Interests: {interests}
+    Preferred accommodation: {accommodation_type}
+    Preferred transportation: {transportation_type}"""
+
+# Define agent functions
+@observe(name="research_agent")
+def research_agent(state: TripPlanningState) -> Dict[str, Any]:
+    """Agent responsible for researching the destination."""
+    messages = state.messages
+    destination = state.destination
     
     response = get_llm().invoke([
-        SystemMessage(content=system_prompt),
+        SystemMessage(content=_RESEARCH_TMPL.format(destination=destination)),
         *messages
     ])
     
-    return {
-        **state,
-        "messages": [response]
-    }
+    # Only return the changed key; parallel branches merge via add_messages
+    return {"messages": [response]}
 
 @observe(name="budget_agent")
-def budget_agent(state: TripPlanningState) -> TripPlanningState:
+def budget_agent(state: TripPlanningState) -> Dict[str, Any]:
     """Agent responsible for budget planning and allocation."""
-    messages = state["messages"]
-    
-    system_prompt = """You are a budget planning specialist. Your job is to create a detailed budget breakdown for the trip.
-    Use the calculate_budget_breakdown tool to allocate the budget across different categories.
-    Provide recommendations for cost-saving opportunities."""
+    messages = state.messages
     
     response = get_llm().invoke([
-        SystemMessage(content=system_prompt),
+        _BUDGET_SYS,
         *messages
     ])
     
-    return {
-        **state,
-        "messages": [response]
-    }
+    # Only return the changed key; parallel branches merge via add_messages
+    return {"messages": [response]}
 
 @observe(name="itinerary_agent")
-def itinerary_agent(state: TripPlanningState) -> TripPlanningState:
+def itinerary_agent(state: TripPlanningState) -> Dict[str, Any]:
     """Agent responsible for creating the detailed itinerary."""
-    messages = state["messages"]
-    
-    system_prompt = """You are an itinerary planning specialist. Your job is to create a detailed day-by-day itinerary.
-    Use the generate_itinerary tool to create a comprehensive schedule.
-    Consider the user's interests, budget, and duration to create an optimal plan."""
+    messages = state.messages
     
     response = get_llm().invoke([
-        SystemMessage(content=system_prompt),
+        _ITINERARY_SYS,
         *messages
     ])
     
-    return {
-        **state,
-        "messages": [response]
-    }
+    # Only return the changed key; parallel branches merge via add_messages
+    return {"messages": [response]}
 
 @observe(name="accommodation_agent")
-def accommodation_agent(state: TripPlanningState) -> TripPlanningState:
+def accommodation_agent(state: TripPlanningState) -> Dict[str, Any]:
     """Agent responsible for finding suitable accommodations."""
-    messages = state["messages"]
-    
-    system_prompt = """You are an accommodation specialist. Your job is to find suitable places to stay.
-    Use the find_accommodations tool to get accommodation options within the budget.
-    Consider location, amenities, and value for money."""
+    messages = state.messages
     
     response = get_llm().invoke([
-        SystemMessage(content=system_prompt),
+        _ACCOMMODATION_SYS,
         *messages
     ])
     
-    return {
-        **state,
-        "messages": [response]
-    }
+    # Only return the changed key; parallel branches merge via add_messages
+    return {"messages": [response]}
 
 @observe(name="coordinator_agent")
-def coordinator_agent(state: TripPlanningState) -> TripPlanningState:
+def coordinator_agent(state: TripPlanningState) -> Dict[str, Any]:
     """Coordinator agent that synthesizes all information into a final plan."""
-    messages = state["messages"]
+    messages = state.messages
     
     # Get the key parameters from the state
-    destination = state.get("destination", "Unknown")
-    duration = state.get("duration", 0)
-    budget = state.get("budget", 0)
-    interests = state.get("interests", [])
-    
-    system_prompt = f"""You are the trip planning coordinator. Your job is to synthesize all the research and recommendations
-    into a comprehensive, actionable trip plan for {destination}.
-    
-    Trip Details:
-    - Destination: {destination}
-    - Duration: {duration} days
-    - Budget: ${budget}
-    - Interests: {', '.join(interests) if interests else 'General travel'}
-    
-    Create a final summary that includes:
-    1. Destination overview for {destination}
-    2. Budget breakdown for ${budget}
-    3. Detailed {duration}-day itinerary for {destination}
-    4. Accommodation recommendations in {destination}
-    5. Practical tips and reminders for {destination}
-    
-    Make sure the plan is realistic, within budget, and matches the user's interests. Focus specifically on {destination}."""
+    destination = state.destination
+    duration = state.duration
+    budget = state.budget
+    interests = state.interests
+    
+    system_prompt = _COORDINATOR_TMPL.format(
+        destination=destination,
+        duration=duration,
+        budget=budget,
+        interests=', '.join(interests) if interests else 'General travel',
+    )
     
     response = get_llm().invoke([
         SystemMessage(content=system_prompt),
         *messages
     ])
     
-    return {
-        **state,
-        "messages": [response],
-        "final_plan": {"summary": response.content}
-    }
+    return {"messages": [response], "final_plan": {"summary": response.content}}
+
+# Routing keywords checked in priority order by should_continue
+_ROUTES = ("research", "budget", "itinerary", "accommodation")
 
 def should_continue(state: TripPlanningState) -> str:
     """Determine the next step in the workflow."""
-    messages = state["messages"]
+    messages = state.messages
     last_message = messages[-1]
     
     # Simple routing logic - in a real implementation, this would be more sophisticated
-    if "research" in last_message.content.lower():
-        return "research"
-    elif "budget" in last_message.content.lower():
-        return "budget"
-    elif "itinerary" in last_message.content.lower():
-        return "itinerary"
-    elif "accommodation" in last_message.content.lower():
-        return "accommodation"
-    else:
-        return "coordinator"
+    content = last_message.content.lower()
+    for keyword in _ROUTES:
+        if keyword in content:
+            return keyword
+    return "coordinator"
 
 # Create the workflow graph
 def create_trip_planner_graph():
@@ -356,16 +415,14 @@ def create_trip_planner_graph():
     workflow.add_node("accommodation_agent", accommodation_agent)
     workflow.add_node("coordinator_agent", coordinator_agent)
     
-    # Add edges - create a sequential flow
-    workflow.add_edge("research_agent", "budget_agent")
-    workflow.add_edge("budget_agent", "itinerary_agent")
-    workflow.add_edge("itinerary_agent", "accommodation_agent")
-    workflow.add_edge("accommodation_agent", "coordinator_agent")
+    # Add edges - the specialist agents only depend on the request fields,
+    # so they fan out from the entry point and the coordinator joins them
+    specialists = ["research_agent", "budget_agent", "itinerary_agent", "accommodation_agent"]
+    for node in specialists:
+        workflow.add_edge(START, node)
+    workflow.add_edge(specialists, "coordinator_agent")
     workflow.add_edge("coordinator_agent", END)
     
-    # Set entry point
-    workflow.set_entry_point("research_agent")
-    
     return workflow.compile()
 
 # Initialize the graph lazily to avoid hanging on import
@@ -389,9 +446,23 @@ def plan_trip(trip_request: TripRequest) -> Dict[str, Any]:
         # Use the actual LangGraph workflow with OpenAI API calls
         graph = get_trip_planner_graph()
         
-        # Create initial state for the workflow
+        # Create initial state for the workflow; the request message gives
+        # every specialist the trip details since they all start in parallel
         initial_state = {
-            "messages": [],
+            "messages": [
+                HumanMessage(
+                    content=_REQUEST_TMPL.format(
+                        destination=trip_request.destination,
+                        start_date=trip_request.start_date,
+                        end_date=trip_request.end_date,
+                        duration=trip_request.duration,
+                        budget=trip_request.budget,
+                        interests=', '.join(trip_request.interests) if trip_request.interests else 'General travel',
+                        accommodation_type=trip_request.accommodation_type,
+                        transportation_type=trip_request.transportation_type,
+                    )
+                )
+            ],
             "destination": trip_request.destination,
             "duration": trip_request.duration,
             "budget": trip_request.budget,
@@ -406,6 +477,7 @@ def plan_trip(trip_request: TripRequest) -> Dict[str, Any]:
         final_state = graph.invoke(initial_state)
         
         # Extract the result from the final state
+        # graph.invoke returns the channel values as a plain dict
         final_plan_data = final_state.get("final_plan", {})
         result = {
             "final_plan": {
@@ -418,7 +490,7 @@ def plan_trip(trip_request: TripRequest) -> Dict[str, Any]:
                 "accommodation": final_state.get("accommodation", {}),
                 "transportation": final_state.get("transportation", {}),
                 "budget_breakdown": final_state.get("budget_breakdown", {}),
-                "recommendations": final_state.get("recommendations", []),
+                "recommendations": final_state.get("recommendations", {}),
                 "tips": final_state.get("tips", "")
             },
             "messages": [
@@ -437,20 +509,20 @@ def plan_trip(trip_request: TripRequest) -> Dict[str, Any]:
         
         # Calculate execution time
         execution_time_ms = (time.time() - start_time) * 1000
-        print(f"✅ Trip planning completed in {execution_time_ms:.2f}ms")
+        logger.info("Trip planning completed in %.2fms", execution_time_ms)
         
         return result
         
-    except Exception as e:
+    except Exception:
         # Calculate execution time for error case
         execution_time_ms = (time.time() - start_time) * 1000
-        print(f"❌ Trip planning failed after {execution_time_ms:.2f}ms: {str(e)}")
+        logger.exception("Trip planning failed after %.2fms", execution_time_ms)
         
         # Re-raise the exception
-        raise e
+        raise
 
 if __name__ == "__main__":
-    # Example usage
+    # Example usage: python -m backend.trip_planner_agent
     sample_request = TripRequest(
         destination="Paris",
         duration=5,
@@ -463,4 +535,4 @@ if __name__ == "__main__":
     )
     
     result = plan_trip(sample_request)
-    print(json.dumps(result, indent=2))
+    print(_dumps(result))